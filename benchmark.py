@@ -0,0 +1,193 @@
+import argparse
+import json
+import math
+import os
+import sys
+import time
+from datetime import date, datetime
+from urllib.parse import urlencode
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, ORJSONResponse
+
+# Synthetic page shaped like the /get_all_students response
+def student_page(students: int, courses: int = 3, remarks: int = 5):
+    now = datetime.utcnow()
+    return {
+        "students": [
+            {
+                "student_id": i,
+                "name": f"Student {i}",
+                "email": f"student{i}@example.com",
+                "contact_1": "9876543210",
+                "contact_2": "9876543211",
+                "area": "Navrangpura",
+                "college_name": "Gujarat University",
+                "mode": "offline",
+                "date_of_join": date(2023, 6, 1),
+                "reference": "Walk-in",
+                "remarks": [
+                    {"remark": f"Follow-up call {r}", "status": 1, "time_stamp": now}
+                    for r in range(remarks)
+                ],
+                "courses": [
+                    {"course_id": c, "course_name": f"Course {c}", "fees": 15000.0, "time_stamp": now}
+                    for c in range(courses)
+                ],
+            }
+            for i in range(students)
+        ],
+        "next_cursor": students,
+    }
+
+def time_per_call(func, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - start) / repeat * 1000
+
+# Before: FastAPI runs the returned dict through jsonable_encoder and json.dumps.
+# After: the endpoint hands the dict straight to ORJSONResponse.
+def bench_serialization(students: int, repeat: int):
+    payload = student_page(students)
+    before = time_per_call(lambda: JSONResponse(content=jsonable_encoder(payload)).body, repeat)
+    after = time_per_call(lambda: ORJSONResponse(payload).body, repeat)
+
+    print(f"/get_all_students serialization, {students} students per page")
+    print(f"  jsonable_encoder + json: {before:8.3f} ms/request")
+    print(f"  orjson:                  {after:8.3f} ms/request")
+    print(f"  speedup:                 {before / after:8.1f}x")
+
+# Nearest-rank percentile of an already sorted list
+def percentile(values, pct: float) -> float:
+    return values[max(0, math.ceil(pct / 100 * len(values)) - 1)]
+
+def route_label(method: str, url: str, kwargs: dict) -> str:
+    params = kwargs.get("params")
+    return f"{method} {url}" + (f"?{urlencode(sorted(params.items()))}" if params else "")
+
+# Seeds an empty database, then drives every route through the ASGI app and
+# reports throughput, latency percentiles and SQL statements per request.
+# Requests run one after another, so req/s is single-client throughput
+def bench_endpoints(args):
+    os.environ["DATABASE_URL"] = args.database_url
+    # Imported here so the serialization benchmark does not need a database
+    import main
+    import manage
+    from fastapi.testclient import TestClient
+    from sqlalchemy import event
+
+    main.init_engines()
+    main.Base.metadata.create_all(bind=main.engine)
+    db = main.SessionLocal()
+    try:
+        if db.query(main.Student.id).first() is not None:
+            sys.exit("The benchmark seeds its own data, point --database-url at an empty database")
+        start = time.perf_counter()
+        manage.seed_database(db, students=args.students, courses=args.courses, batches=args.batches)
+        print(f"Seeded {args.students} students, {args.courses} courses, {args.batches} batches in {time.perf_counter() - start:.1f} s")
+    finally:
+        db.close()
+
+    statements = [0]
+
+    def count_statement(*_):
+        statements[0] += 1
+
+    event.listen(main.engine, "before_cursor_execute", count_statement)
+
+    client = TestClient(main.app)
+    login = {"email": "counselor1@example.com", "password": manage.SEED_PASSWORD}
+    token = client.post("/login", data=login).json()["detail"]["access_token"]
+
+    results = {}
+    for run in range(args.warmup + args.requests):
+        for method, url, kwargs in manage.route_requests(token, args.students, run):
+            label = route_label(method, url, kwargs)
+            if args.routes and not any(route in label for route in args.routes):
+                continue
+            statements[0] = 0
+            start = time.perf_counter()
+            response = client.request(method, url, **kwargs)
+            elapsed = time.perf_counter() - start
+            if response.status_code >= 400:
+                sys.exit(f"{label}: HTTP {response.status_code} {response.text[:200]}")
+            if run < args.warmup:
+                continue
+            result = results.setdefault(label, {"latencies": [], "statements": []})
+            result["latencies"].append(elapsed)
+            result["statements"].append(statements[0])
+
+    report = {}
+    width = max((len(label) for label in results), default=5)
+    print(f"{'route':<{width}} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'SQL/req':>8}")
+    for label, result in results.items():
+        latencies = sorted(result["latencies"])
+        report[label] = {
+            "rps": round(len(latencies) / sum(latencies), 1),
+            "p50_ms": round(percentile(latencies, 50) * 1000, 3),
+            "p95_ms": round(percentile(latencies, 95) * 1000, 3),
+            "p99_ms": round(percentile(latencies, 99) * 1000, 3),
+            "statements": round(sum(result["statements"]) / len(result["statements"]), 2),
+        }
+        row = report[label]
+        print(f"{label:<{width}} {row['rps']:>8} {row['p50_ms']:>8} {row['p95_ms']:>8} {row['p99_ms']:>8} {row['statements']:>8}")
+
+    config = {"students": args.students, "courses": args.courses, "batches": args.batches, "requests": args.requests}
+    if args.save_baseline:
+        with open(args.baseline, "w") as file:
+            json.dump({"config": config, "routes": report}, file, indent=2, sort_keys=True)
+        print(f"Baseline saved to {args.baseline}")
+    elif os.path.exists(args.baseline):
+        if not compare_baseline(args.baseline, config, report, args.tolerance):
+            sys.exit(1)
+
+# A route regresses when it issues more statements than the baseline (the
+# count is deterministic) or its p95 grows by more than the tolerance
+def compare_baseline(path: str, config: dict, report: dict, tolerance: float) -> bool:
+    with open(path) as file:
+        baseline = json.load(file)
+    if baseline["config"] != config:
+        print(f"Baseline {path} was recorded with {baseline['config']}, not comparing")
+        return True
+
+    regressions = []
+    for label, row in report.items():
+        before = baseline["routes"].get(label)
+        if before is None:
+            continue
+        if row["statements"] > before["statements"]:
+            regressions.append(f"{label}: {before['statements']} -> {row['statements']} statements per request")
+        if row["p95_ms"] > before["p95_ms"] * (1 + tolerance):
+            regressions.append(f"{label}: p95 {before['p95_ms']} -> {row['p95_ms']} ms")
+
+    for regression in regressions:
+        print(f"REGRESSION {regression}")
+    print(f"Compared with {path}: {len(regressions)} regressions")
+    return not regressions
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Institute API benchmarks")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    serialization = commands.add_parser("serialization", help="Measure response serialization cost")
+    serialization.add_argument("--students", type=int, default=100)
+    serialization.add_argument("--repeat", type=int, default=200)
+
+    endpoints = commands.add_parser("endpoints", help="Seed a database and measure every route")
+    endpoints.add_argument("--database-url", default="sqlite:///benchmark.db", help="an empty database, SQLite or MySQL")
+    endpoints.add_argument("--students", type=int, default=10000)
+    endpoints.add_argument("--courses", type=int, default=200)
+    endpoints.add_argument("--batches", type=int, default=2000)
+    endpoints.add_argument("--requests", type=int, default=20, help="timed requests per route")
+    endpoints.add_argument("--warmup", type=int, default=1, help="untimed requests per route")
+    endpoints.add_argument("--routes", nargs="*", help="only routes whose label contains one of these")
+    endpoints.add_argument("--baseline", default="benchmark_baseline.json")
+    endpoints.add_argument("--save-baseline", action="store_true", help="store this run as the baseline instead of comparing")
+    endpoints.add_argument("--tolerance", type=float, default=0.25, help="allowed p95 growth over the baseline")
+
+    args = parser.parse_args()
+    if args.command == "serialization":
+        bench_serialization(args.students, args.repeat)
+    else:
+        bench_endpoints(args)
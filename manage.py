@@ -0,0 +1,318 @@
+import argparse
+import json
+import random
+import re
+import sys
+from datetime import date, datetime, timedelta
+from typing import List
+
+from sqlalchemy import event, func, select, update
+
+import main
+
+SEED_PASSWORD = "password"
+SEED_MODES = ("online", "offline")
+SEED_AREAS = ("Navrangpura", "Maninagar", "Satellite", "Bopal", "Vastrapur")
+
+# Fills an empty database with synthetic counselors, courses, batches, students,
+# remarks, enrollments and audit rows, then builds the course rollups
+def seed_database(db, students: int = 1000, courses: int = 20, batches: int = 50, counselors: int = 5, seed: int = 0):
+    rng = random.Random(seed)
+    now = datetime.utcnow()
+    password = main.hash_password(SEED_PASSWORD)
+
+    db.bulk_insert_mappings(main.Counselor, [
+        {"id": i, "name": f"Counselor {i}", "email": f"counselor{i}@example.com", "password": password}
+        for i in range(1, counselors + 1)
+    ])
+    db.bulk_insert_mappings(main.Course, [
+        {
+            "id": i, "name": f"Course {i}", "fees": 5000.0 + 500 * (i % 20), "duration": "3 months",
+            "pdf": f"https://example.com/course{i}.pdf", "prerequisites_sub": "", "sample_project": "",
+            "description": f"Course {i}", "other_link": "", "objective": "", "note": "", "status": 1,
+        }
+        for i in range(1, courses + 1)
+    ])
+    db.bulk_insert_mappings(main.CourseCounselor, [
+        {"course_id": i, "counselor_id": rng.randint(1, counselors), "type_of_operation": "add", "time_stamp": now - timedelta(days=rng.randint(0, 365))}
+        for i in range(1, courses + 1)
+    ])
+    db.bulk_insert_mappings(main.Batch, [
+        {
+            "id": i, "name": f"Batch {i}", "course_id": rng.randint(1, courses), "time": f"{9 + i % 8}:00",
+            "trainer_name": f"Trainer {i % 10}", "daily_hours": 2.0, "weekly_days": "Mon,Wed,Fri",
+            "start_date": date.today() - timedelta(days=rng.randint(0, 180)),
+            "expected_end_date": date.today() + timedelta(days=rng.randint(30, 180)),
+            "status": rng.randint(0, 1), "time_stamp": now - timedelta(days=rng.randint(0, 180)),
+        }
+        for i in range(1, batches + 1)
+    ])
+    db.bulk_insert_mappings(main.BatchCounselor, [
+        {"batch_id": i, "counselor_id": rng.randint(1, counselors), "type_of_operation": "add", "time_stamp": now - timedelta(days=rng.randint(0, 180))}
+        for i in range(1, batches + 1)
+    ])
+
+    student_rows, remark_rows, enrollment_rows = [], [], []
+    for i in range(1, students + 1):
+        joined = now - timedelta(days=rng.randint(0, 365))
+        student_rows.append({
+            "id": i, "name": f"Student {i}", "email": f"student{i}@example.com",
+            "contact_1": f"98{i:08d}"[:10], "contact_2": "", "area": rng.choice(SEED_AREAS),
+            "college_name": f"College {i % 25}", "mode": rng.choice(SEED_MODES),
+            "date_of_join": joined.date(), "reference": "Walk-in",
+        })
+        for r in range(rng.randint(1, 5)):
+            remark_rows.append({
+                "student_id": i, "counselor_id": rng.randint(1, counselors), "remark": f"Follow-up {r + 1}",
+                "status": 1, "time_stamp": joined + timedelta(days=r * 7),
+            })
+        student_rows[-1]["last_remark_at"] = remark_rows[-1]["time_stamp"]
+        student_rows[-1]["last_remark_status"] = remark_rows[-1]["status"]
+        for course_id in rng.sample(range(1, courses + 1), min(courses, rng.randint(1, 3))):
+            enrollment_rows.append({"student_id": i, "course_id": course_id, "fees": 5000.0, "time_stamp": joined})
+    db.bulk_insert_mappings(main.Student, student_rows)
+    db.bulk_insert_mappings(main.StudentRemarks, remark_rows)
+    db.bulk_insert_mappings(main.StudentCourse, enrollment_rows)
+    db.commit()
+
+    main.rebuild_course_rollups(db)
+
+# Requests covering every database-backed route, as (method, url, client kwargs).
+# `run` keeps the emails of the created students unique across repeated runs
+def route_requests(token: str, students: int, run: int = 0):
+    auth = {"Authorization": f"Bearer {token}"}
+    course_form = {
+        "name": "Plan check course", "fees": "9000", "duration": "2 months", "pdf": "https://example.com/plan.pdf",
+        "prerequisites_sub": "None", "sample_project": "None", "description": "Plan check", "other_link": "None",
+        "objective": "None", "note": "None",
+    }
+    batch_form = {
+        "name": "Plan check batch", "time": "10:00", "trainer_name": "Trainer 1", "daily_hours": "2",
+        "weekly_days": "Mon,Wed,Fri", "start_date": date.today().isoformat(),
+        "expected_end_date": (date.today() + timedelta(days=60)).isoformat(),
+    }
+    student = {
+        "name": "Plan check", "email": f"plan.check{run}@example.com", "contact_1": "9800000000", "contact_2": "",
+        "area": SEED_AREAS[0], "college_name": "College 1", "mode": "online", "date_of_join": date.today().isoformat(),
+        "reference": "Walk-in", "counselor_id": 1, "course_ids": [1, 2], "fees_list": [5000, 6000], "pdf_list": [], "remark": "Joined",
+    }
+    imported = "\n".join(
+        json.dumps(dict(student, email=f"plan.import{run}.{i}@example.com", course_ids=[3], fees_list=[5000]))
+        for i in range(3)
+    )
+    middle = students // 2
+    return [
+        ("POST", "/add_course", {"headers": auth, "data": course_form}),
+        ("PUT", "/update_course/1", {"headers": auth, "data": dict(course_form, status="1")}),
+        ("GET", "/get_all_courses", {}),
+        ("GET", "/get_all_courses", {"params": {"status": 1}}),
+        ("GET", "/get_course/1", {}),
+        ("GET", "/get_all_course_and_fees", {}),
+        ("GET", "/get_all_course_counselor", {}),
+        ("GET", "/get_all_course_counselor", {"params": {"after": middle // 100}}),
+        ("GET", "/get_all_course_counselor", {"params": {"course_id": 1}}),
+        ("GET", "/get_all_course_counselor", {"params": {"counselor_id": 1}}),
+        ("GET", "/get_all_course_counselor", {"params": {"from": "2020-01-01T00:00:00"}}),
+        ("GET", "/get_all_course_counselor", {"params": {"counselor_id": 1, "from": "2020-01-01T00:00:00"}}),
+        ("POST", "/add_batch", {"headers": auth, "data": dict(batch_form, course_id="1")}),
+        ("PUT", "/update_batch/1", {"headers": auth, "data": dict(batch_form, status="1")}),
+        ("GET", "/get_all_batches", {}),
+        ("GET", "/get_all_batches", {"params": {"after": 10}}),
+        ("GET", "/get_all_batches", {"params": {"status": 1}}),
+        ("GET", "/get_all_batches", {"params": {"course_id": 1}}),
+        ("GET", "/get_all_batches", {"params": {"trainer_name": "Trainer 1"}}),
+        ("GET", "/get_all_batches", {"params": {"start_from": (date.today() - timedelta(days=30)).isoformat()}}),
+        ("GET", "/get_all_batches", {"params": {"end_from": date.today().isoformat()}}),
+        ("GET", "/get_all_batches", {"params": {"status": 1, "start_to": date.today().isoformat(), "end_from": date.today().isoformat()}}),
+        ("GET", "/get_all_batches", {"params": {"course_id": 1, "trainer_name": "Trainer 1"}}),
+        ("GET", "/get_batch/1", {}),
+        ("GET", "/trainer_schedule", {"params": {"trainer_name": "Trainer 1", "from": date.today().isoformat()}}),
+        ("GET", "/get_all_batch_counselor", {}),
+        ("GET", "/get_all_batch_counselor", {"params": {"after": 10}}),
+        ("GET", "/get_all_batch_counselor", {"params": {"batch_id": 1}}),
+        ("GET", "/get_all_batch_counselor", {"params": {"counselor_id": 1}}),
+        ("GET", "/get_all_batch_counselor", {"params": {"from": "2020-01-01T00:00:00"}}),
+        ("GET", "/get_all_batch_counselor", {"params": {"counselor_id": 1, "from": "2020-01-01T00:00:00"}}),
+        ("POST", "/add_student", {"json": student}),
+        ("PUT", f"/update_student/{middle}", {"json": dict(student, email=f"student{middle}@example.com", course_ids=[1, 3], fees_list=[5000, 5000])}),
+        ("POST", "/import_students", {"params": {"format": "ndjson"}, "files": {"file": ("students.ndjson", imported)}}),
+        ("GET", "/export_students", {"params": {"format": "csv"}}),
+        ("GET", "/get_all_students", {}),
+        ("GET", "/get_all_students", {"params": {"after": middle}}),
+        ("GET", "/get_all_students", {"params": {"mode": "online"}}),
+        ("GET", "/get_all_students", {"params": {"after": middle, "mode": "online"}}),
+        ("GET", f"/get_student/{middle}", {}),
+        ("GET", f"/get_student_remarks/{middle}", {"params": {"limit": 2}}),
+        ("GET", "/followups", {"params": {"days": 30}}),
+        ("GET", "/get_course_rollups", {}),
+        ("GET", "/get_course_rollups/mode", {"params": {"course_id": 1}}),
+        ("GET", "/search_course", {"params": {"search_course": "course"}}),
+        ("GET", "/search_batch", {"params": {"search_batch": "trainer"}}),
+        ("GET", "/search_student", {"params": {"search_term": "student 1"}}),
+    ]
+
+# Routes whose statements may scan a whole table, with the reason
+FULL_SCAN_ROUTES = {
+    "/get_all_course_and_fees": "unpaginated course catalogue, served from the response cache",
+}
+
+# Filter sets that may scan a whole table, per route, with the reason. Only a
+# request with exactly these filters (besides limit and after) passes; the
+# route's other requests are still checked. A date or time range alone cannot
+# use its index while pages follow id order, so the table is walked in id order
+FULL_SCAN_FILTERS = {
+    ("/get_all_batches", ("start_from",)): "start date window without status, batch holds one row per batch",
+    ("/get_all_batches", ("end_from",)): "end date window without status, batch holds one row per batch",
+    ("/get_all_course_counselor", ("from",)): "audit time range without course_id or counselor_id",
+    ("/get_all_batch_counselor", ("from",)): "audit time range without batch_id or counselor_id",
+}
+
+# SQLite reports reading every row of a table as "SCAN <table>"; a lookup or
+# range is "SEARCH <table> ...". Walks of a whole index ("SCAN <table> USING
+# [COVERING] INDEX", MySQL type "index") are not counted: the conditional GET
+# validators count rows that way
+SQLITE_TABLE_SCAN = re.compile(r"^SCAN (?:TABLE )?(\w+)(?: AS \w+)?$")
+# A plain keyset page: no filter but the cursor, in primary key order, with
+# optional to-one LEFT OUTER JOINs on the joined table's primary key (names)
+PRIMARY_KEY_PAGE = re.compile(
+    r"^SELECT .+? FROM (\w+)(?: LEFT OUTER JOIN (\w+) ON \2\.id = \1\.\w+)*"
+    r"(?: WHERE \1\.id [<>] \?)? ORDER BY \1\.id(?: ASC| DESC)? LIMIT \? OFFSET \?$"
+)
+
+# Tables the statement reads in full. SQLite also reports a plain primary key
+# page as a SCAN; that one passes when no sort step follows, as the rowid walk
+# then stops after LIMIT rows. A page with any other filter may walk the whole
+# table to fill itself, so it does not pass. MySQL shows a plain page as an
+# "index" walk of PRIMARY
+def full_scans(connection, statement: str, parameters) -> List[str]:
+    if connection.dialect.name == "sqlite":
+        details = [row[3] for row in connection.exec_driver_sql("EXPLAIN QUERY PLAN " + statement, parameters)]
+        tables = [match.group(1) for match in map(SQLITE_TABLE_SCAN.match, details) if match]
+        page = PRIMARY_KEY_PAGE.match(" ".join(statement.split()))
+        if page and not any(detail.startswith("USE TEMP B-TREE") for detail in details):
+            tables = [table for table in tables if table != page.group(1)]
+    else:
+        rows = connection.exec_driver_sql("EXPLAIN " + statement, parameters).mappings()
+        tables = [row["table"] for row in rows if row["type"] == "ALL"]
+    return [table for table in tables if table in main.Base.metadata.tables]
+
+# Drives every route with the client and runs EXPLAIN on each SELECT, UPDATE
+# and DELETE it issued. Returns a line per failed request or full scan, outside
+# the routes in FULL_SCAN_ROUTES
+def query_plan_problems(client, token: str, students: int) -> List[str]:
+    captured = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().split(None, 1)[0].upper() in ("SELECT", "UPDATE", "DELETE"):
+            captured.append((statement, parameters[0] if executemany else parameters))
+
+    problems = []
+    event.listen(main.engine, "before_cursor_execute", capture)
+    try:
+        for method, url, kwargs in route_requests(token, students):
+            captured.clear()
+            response = client.request(method, url, **kwargs)
+            if response.status_code >= 400:
+                problems.append(f"{method} {url}: HTTP {response.status_code} {response.text[:200]}")
+                continue
+            statements = list(captured)
+            route = "/" + url.split("/", 2)[1]
+            filters = tuple(sorted(name for name in kwargs.get("params", {}) if name not in ("limit", "after")))
+            if route in FULL_SCAN_ROUTES or (route, filters) in FULL_SCAN_FILTERS:
+                continue
+            with main.engine.connect() as connection:
+                for statement, parameters in statements:
+                    tables = full_scans(connection, statement, parameters)
+                    if tables:
+                        problems.append(f"{method} {url}: full scan of {', '.join(tables)}\n    {' '.join(statement.split())}")
+    finally:
+        event.remove(main.engine, "before_cursor_execute", capture)
+    return problems
+
+# Seeds an empty database and fails when any route's statement falls back to
+# a full scan, see query_plan_problems. tests/test_query_plans.py runs the same
+# check on SQLite; this command runs it against DATABASE_URL, e.g. MySQL
+def check_query_plans(students: int = 1000):
+    # TestClient needs requests, which is only in requirements-dev.txt
+    from fastapi.testclient import TestClient
+
+    main.Base.metadata.create_all(bind=main.engine)
+    db = main.SessionLocal()
+    try:
+        if db.query(main.Student.id).first() is not None:
+            sys.exit("check_query_plans seeds its own data, point DATABASE_URL at an empty database")
+        seed_database(db, students=students)
+        # The in-process search and schedule indexes load whole tables when they
+        # are (re)built; build them first so each route is checked on its own statements
+        main.ensure_search_indexes(db)
+        main.ensure_schedule_index(db)
+    finally:
+        db.close()
+
+    client = TestClient(main.app)
+    token = client.post("/login", data={"email": "counselor1@example.com", "password": SEED_PASSWORD}).json()["detail"]["access_token"]
+    problems = query_plan_problems(client, token, students)
+    for problem in problems:
+        print(problem)
+    print(f"{len(problems)} problems")
+    if problems:
+        sys.exit(1)
+
+# Fills student.last_remark_at / last_remark_status from student_remarks for
+# rows written before the columns existed, one id range per transaction
+def backfill_last_remarks(chunk_size: int = 1000):
+    def latest(column):
+        return (
+            select(column)
+            .where(main.StudentRemarks.student_id == main.Student.id)
+            .order_by(main.StudentRemarks.time_stamp.desc(), main.StudentRemarks.id.desc())
+            .limit(1)
+            .scalar_subquery()
+        )
+
+    db = main.SessionLocal()
+    try:
+        max_id = db.query(func.max(main.Student.id)).scalar() or 0
+        for start in range(0, max_id, chunk_size):
+            db.execute(
+                update(main.Student.__table__)
+                .where(main.Student.id > start, main.Student.id <= start + chunk_size)
+                .values(last_remark_at=latest(main.StudentRemarks.time_stamp), last_remark_status=latest(main.StudentRemarks.status))
+            )
+            db.commit()
+    finally:
+        db.close()
+    print(f"Last remarks backfilled for students up to id {max_id}")
+
+# Creates any missing tables. Run once per deploy instead of on every worker start
+def create_tables():
+    main.Base.metadata.create_all(bind=main.engine)
+    print("Tables created")
+
+# Recomputes the course_rollup table from student_course. Stop the API first,
+# enrollments written while it runs may be missed
+def rebuild_course_rollups():
+    db = main.SessionLocal()
+    try:
+        main.rebuild_course_rollups(db)
+    finally:
+        db.close()
+    print("Course rollups rebuilt")
+
+COMMANDS = {
+    "backfill_last_remarks": backfill_last_remarks,
+    "check_query_plans": check_query_plans,
+    "create_tables": create_tables,
+    "rebuild_course_rollups": rebuild_course_rollups,
+}
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Institute API management commands")
+    parser.add_argument("command", choices=sorted(COMMANDS))
+    args = parser.parse_args()
+
+    main.init_engines()
+    try:
+        COMMANDS[args.command]()
+    finally:
+        main.engine.dispose()
@@ -0,0 +1,49 @@
+import os
+import sys
+
+import pytest
+
+# Read by main at import: no mail dispatcher thread, and tokens signed with a
+# fixed key
+os.environ.setdefault("MAIL_DISPATCHER_ENABLED", "0")
+os.environ.setdefault("SECRET_KEY", "test-secret")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import main
+import manage
+from fastapi.testclient import TestClient
+
+# Points the app at a fresh SQLite file seeded by manage.seed_database and
+# returns a client for it. The in-process indexes and caches are reset, so
+# nothing from an earlier database is served
+@pytest.fixture
+def seeded_client(tmp_path, monkeypatch):
+    databases = []
+
+    def seed(students: int = 100, **volumes):
+        if main.engine is not None:
+            main.engine.dispose()
+            main.engine = None
+        monkeypatch.setenv("DATABASE_URL", f"sqlite:///{tmp_path / f'test{len(databases)}.db'}")
+        main.init_engines()
+        main.Base.metadata.create_all(bind=main.engine)
+        db = main.SessionLocal()
+        try:
+            manage.seed_database(db, students=students, **volumes)
+        finally:
+            db.close()
+        reset_app_state(monkeypatch)
+        databases.append(students)
+        return TestClient(main.app)
+
+    yield seed
+    if main.engine is not None:
+        main.engine.dispose()
+        main.engine = None
+
+def reset_app_state(monkeypatch):
+    for name in ("student_index", "course_index", "batch_index"):
+        monkeypatch.setattr(main, name, main.TrigramIndex(getattr(main, name).loader))
+    monkeypatch.setattr(main, "schedule_index", main.ScheduleIndex())
+    main.course_cache.clear()
+    main.counselor_cache.clear()
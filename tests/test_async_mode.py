@@ -0,0 +1,55 @@
+import os
+import subprocess
+import sys
+
+# DB_MODE is read when main is imported, so async mode runs in its own
+# interpreter: seed a SQLite file, then drive the endpoints through aiosqlite
+SMOKE = """
+import asyncio
+import main, manage
+from fastapi.testclient import TestClient
+
+assert main.DB_MODE == "async"
+main.init_engines()
+main.Base.metadata.create_all(bind=main.engine)
+db = main.SessionLocal()
+manage.seed_database(db, students=50)
+db.close()
+
+# Password hashing must not run on the event loop thread
+hashed_on_loop = []
+hash_password = main.hash_password
+def spy(*args, **kwargs):
+    try:
+        asyncio.get_running_loop()
+        hashed_on_loop.append(True)
+    except RuntimeError:
+        hashed_on_loop.append(False)
+    return hash_password(*args, **kwargs)
+main.hash_password = spy
+
+client = TestClient(main.app)
+token = client.post("/login", data={"email": "counselor1@example.com", "password": manage.SEED_PASSWORD}).json()["detail"]["access_token"]
+for method, url, kwargs in manage.route_requests(token, 50):
+    response = client.request(method, url, **kwargs)
+    assert response.status_code < 400, (method, url, response.status_code, response.text)
+
+students = client.get("/get_all_students", params={"limit": 1000}).json()["students"]
+assert len(students) == 50 + 1 + 3, len(students)
+assert main.async_engine.dialect.driver == "aiosqlite"
+assert hashed_on_loop == [False], hashed_on_loop
+"""
+
+def test_endpoints_run_on_the_async_engine(tmp_path):
+    database = tmp_path / "async.db"
+    env = dict(
+        os.environ,
+        DB_MODE="async",
+        DATABASE_URL=f"sqlite:///{database}",
+        ASYNC_DATABASE_URL=f"sqlite+aiosqlite:///{database}",
+        MAIL_DISPATCHER_ENABLED="0",
+        SECRET_KEY="test-secret",
+    )
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    result = subprocess.run([sys.executable, "-c", SMOKE], cwd=root, env=env, capture_output=True, text=True, timeout=120)
+    assert result.returncode == 0, result.stderr
@@ -0,0 +1,48 @@
+import logging
+
+import main
+import manage
+
+COURSE_FORM = {
+    "name": "Auth course", "fees": "9000", "duration": "2 months", "pdf": "https://example.com/auth.pdf",
+    "prerequisites_sub": "None", "sample_project": "None", "description": "Auth", "other_link": "None",
+    "objective": "None", "note": "None",
+}
+
+def login(client) -> dict:
+    response = client.post("/login", data={"email": "counselor2@example.com", "password": manage.SEED_PASSWORD})
+    return {"Authorization": f"Bearer {response.json()['detail']['access_token']}"}
+
+def latest_operation(course_name: str):
+    db = main.SessionLocal()
+    try:
+        return (
+            db.query(main.CourseCounselor.counselor_id, main.CourseCounselor.type_of_operation)
+            .join(main.Course, main.Course.id == main.CourseCounselor.course_id)
+            .filter(main.Course.name == course_name)
+            .one()
+        )
+    finally:
+        db.close()
+
+def test_write_with_token_records_the_token_counselor(seeded_client):
+    client = seeded_client(students=10)
+    response = client.post("/add_course", headers=login(client), data=dict(COURSE_FORM, counselor_id="1"))
+    assert response.status_code == 200, response.text
+    # The form field is ignored when a token is sent
+    assert latest_operation("Auth course").counselor_id == 2
+
+def test_counselor_id_form_field_is_refused_by_default(seeded_client):
+    client = seeded_client(students=10)
+    response = client.post("/add_course", data=dict(COURSE_FORM, counselor_id="1"))
+    assert response.status_code == 401
+    assert response.headers["www-authenticate"] == "Bearer"
+
+def test_counselor_id_form_field_is_logged_when_allowed(seeded_client, monkeypatch, caplog):
+    client = seeded_client(students=10)
+    monkeypatch.setattr(main, "ALLOW_LEGACY_COUNSELOR_ID", True)
+    with caplog.at_level(logging.WARNING, logger="main"):
+        response = client.post("/add_course", data=dict(COURSE_FORM, counselor_id="1"))
+    assert response.status_code == 200, response.text
+    assert latest_operation("Auth course").counselor_id == 1
+    assert any("deprecated counselor_id" in record.getMessage() for record in caplog.records)
@@ -0,0 +1,83 @@
+from datetime import timedelta
+from email.utils import format_datetime, parsedate_to_datetime
+
+import pytest
+
+import manage
+
+STUDENTS = 50
+
+# (url, statements a 304 runs): the student and batch validators are one
+# query, the course validators come from the course cache once warm
+RESOURCES = [
+    ("/get_all_students", 1),
+    ("/get_student/5", 1),
+    ("/get_all_batches", 1),
+    ("/get_batch/1", 1),
+    ("/get_all_courses", 0),
+    ("/get_course/1", 0),
+]
+
+# The write each resource's ETag has to follow
+WRITES = {
+    "/get_all_students": f"/update_student/{STUDENTS // 2}",
+    "/get_student/5": f"/update_student/{STUDENTS // 2}",
+    "/get_all_batches": "/update_batch/1",
+    "/get_batch/1": "/update_batch/1",
+    "/get_all_courses": "/update_course/1",
+    "/get_course/1": "/update_course/1",
+}
+
+def fetch(client, url, **headers):
+    return client.get(url, headers=headers)
+
+def assert_not_modified(response, etag, statements):
+    assert response.status_code == 304, response.text
+    assert response.content == b""
+    assert response.headers["etag"] == etag
+    assert int(response.headers["x-sql-count"]) == statements
+
+@pytest.mark.parametrize("url, statements", RESOURCES)
+def test_if_none_match(seeded_client, url, statements):
+    client = seeded_client(students=STUDENTS)
+    first = fetch(client, url)
+    assert first.status_code == 200, first.text
+    etag = first.headers["etag"]
+
+    for if_none_match in (etag, "W/" + etag, "*", f'"stale", {etag}'):
+        assert_not_modified(fetch(client, url, **{"If-None-Match": if_none_match}), etag, statements)
+
+    stale = fetch(client, url, **{"If-None-Match": '"stale"'})
+    assert stale.status_code == 200
+    assert stale.content == first.content
+
+@pytest.mark.parametrize("url, statements", RESOURCES)
+def test_if_modified_since(seeded_client, url, statements):
+    client = seeded_client(students=STUDENTS)
+    first = fetch(client, url)
+    etag, last_modified = first.headers["etag"], first.headers["last-modified"]
+
+    assert_not_modified(fetch(client, url, **{"If-Modified-Since": last_modified}), etag, statements)
+    earlier = format_datetime(parsedate_to_datetime(last_modified) - timedelta(seconds=1), usegmt=True)
+    assert fetch(client, url, **{"If-Modified-Since": earlier}).status_code == 200
+    assert fetch(client, url, **{"If-Modified-Since": "yesterday"}).status_code == 200
+    # If-None-Match wins over If-Modified-Since
+    assert fetch(client, url, **{"If-None-Match": '"stale"', "If-Modified-Since": last_modified}).status_code == 200
+
+@pytest.mark.parametrize("url", list(WRITES))
+def test_a_write_changes_the_etag(seeded_client, url):
+    client = seeded_client(students=STUDENTS)
+    token = client.post("/login", data={"email": "counselor1@example.com", "password": manage.SEED_PASSWORD}).json()["detail"]["access_token"]
+    writes = {write_url: (method, kwargs) for method, write_url, kwargs in manage.route_requests(token, STUDENTS)}
+
+    etag = fetch(client, url).headers["etag"]
+    assert fetch(client, url, **{"If-None-Match": etag}).status_code == 304
+
+    method, kwargs = writes[WRITES[url]]
+    response = client.request(method, WRITES[url], **kwargs)
+    assert response.status_code == 200, response.text
+
+    response = fetch(client, url, **{"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+    assert fetch(client, url, **{"If-None-Match": response.headers["etag"]}).status_code == 304
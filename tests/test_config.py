@@ -0,0 +1,43 @@
+import pytest
+
+import main
+
+MAIL_SETTINGS = ("MAIL_USERNAME", "MAIL_PASSWORD", "MAIL_FROM", "MAIL_SERVER", "MAIL_USE_CREDENTIALS")
+
+@pytest.fixture
+def mail_env(monkeypatch):
+    for name in MAIL_SETTINGS:
+        monkeypatch.delenv(name, raising=False)
+        monkeypatch.setattr(main.Envs, name, getattr(main.Envs, name))
+    monkeypatch.setattr(main, "MAIL_DISPATCHER_ENABLED", True)
+    monkeypatch.setattr(main.mail_dispatcher, "start", lambda: None)
+    return monkeypatch
+
+@pytest.mark.parametrize("name", ["DATABASE_URL", "ASYNC_DATABASE_URL"])
+def test_engines_need_a_database_url(monkeypatch, name):
+    monkeypatch.setattr(main, "engine", None)
+    monkeypatch.setattr(main, "DB_MODE", "async")
+    monkeypatch.setenv("DATABASE_URL", "sqlite://")
+    monkeypatch.setenv("ASYNC_DATABASE_URL", "sqlite+aiosqlite://")
+    monkeypatch.delenv(name)
+    with pytest.raises(RuntimeError, match=f"{name} is not set"):
+        main.init_engines()
+
+def test_startup_refuses_to_send_mail_without_an_account(mail_env):
+    mail_env.setattr(main, "engine", None)
+    mail_env.setenv("DATABASE_URL", "sqlite://")
+    with pytest.raises(RuntimeError, match="MAIL_FROM, MAIL_USERNAME, MAIL_PASSWORD not set"):
+        main.startup()
+
+def test_mail_from_defaults_to_the_account(mail_env):
+    mail_env.setenv("MAIL_USERNAME", "office@example.com")
+    mail_env.setenv("MAIL_PASSWORD", "app-password")
+    main.Envs.load()
+    assert main.Envs.MAIL_FROM == "office@example.com"
+    assert main.Envs.missing() == []
+
+def test_a_relay_without_credentials_needs_only_the_sender(mail_env):
+    mail_env.setenv("MAIL_USE_CREDENTIALS", "0")
+    mail_env.setenv("MAIL_FROM", "office@example.com")
+    main.Envs.load()
+    assert main.Envs.missing() == []
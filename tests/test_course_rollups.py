@@ -0,0 +1,70 @@
+import threading
+
+import main
+import manage
+
+def rollups():
+    db = main.SessionLocal()
+    try:
+        return {
+            (row.course_id, row.dimension, row.value): (row.enrollments, round(row.total_fees, 2))
+            for row in db.query(main.CourseRollup)
+        }
+    finally:
+        db.close()
+
+def rebuilt_rollups():
+    db = main.SessionLocal()
+    try:
+        main.rebuild_course_rollups(db)
+    finally:
+        db.close()
+    return rollups()
+
+def test_writes_keep_rollups_equal_to_a_rebuild(seeded_client):
+    client = seeded_client(students=50)
+    for method, url, kwargs in manage.route_requests("", 50):
+        if url in ("/add_student", "/import_students") or url.startswith("/update_student/"):
+            response = client.request(method, url, **kwargs)
+            assert response.status_code == 200, response.text
+
+    incremental = rollups()
+    assert incremental == rebuilt_rollups()
+
+def test_concurrent_first_enrollments_both_count(seeded_client):
+    seeded_client(students=10)
+    enrollment = [(1, "online", "A new area", 5000.0)]
+    first_written = threading.Event()
+    commit_first = threading.Event()
+    errors = []
+
+    def write(written: threading.Event = None, commit: threading.Event = None):
+        db = main.SessionLocal()
+        try:
+            main.update_course_rollups(db, added=enrollment)
+            if written is not None:
+                written.set()
+                commit.wait(5)
+            db.commit()
+        except Exception as error:
+            errors.append(error)
+        finally:
+            db.close()
+
+    first = threading.Thread(target=write, args=(first_written, commit_first))
+    first.start()
+    first_written.wait(5)
+    # The second writer starts before the first has committed its new row
+    second = threading.Thread(target=write)
+    second.start()
+    second.join(0.2)
+    commit_first.set()
+    first.join(10)
+    second.join(10)
+
+    assert errors == []
+    assert rollups()[(1, "area", "A new area")] == (2, 10000.0)
+
+def test_rollup_rebuild_is_not_an_http_endpoint(seeded_client):
+    client = seeded_client(students=10)
+    assert client.post("/rebuild_course_rollups").status_code in (404, 405)
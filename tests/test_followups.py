@@ -0,0 +1,92 @@
+from sqlalchemy import event, update
+
+import main
+
+STUDENTS = 1000
+NEVER_REMARKED = [3, 10, 400, 999]
+
+def captured_plans(client, url, **kwargs):
+    captured = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            captured.append((statement, parameters))
+
+    event.listen(main.engine, "before_cursor_execute", capture)
+    try:
+        response = client.get(url, **kwargs)
+    finally:
+        event.remove(main.engine, "before_cursor_execute", capture)
+    assert response.status_code == 200, response.text
+    with main.engine.connect() as connection:
+        plans = [
+            [row[3] for row in connection.exec_driver_sql("EXPLAIN QUERY PLAN " + statement, parameters)]
+            for statement, parameters in captured
+        ]
+    return response.json(), plans
+
+def seed(seeded_client):
+    client = seeded_client(students=STUDENTS)
+    db = main.SessionLocal()
+    try:
+        db.execute(update(main.Student).where(main.Student.id.in_(NEVER_REMARKED)).values(last_remark_at=None, last_remark_status=None))
+        db.commit()
+    finally:
+        db.close()
+    return client
+
+def expected_followups(days: int):
+    db = main.SessionLocal()
+    try:
+        students = db.query(main.Student.id, main.Student.last_remark_at).all()
+    finally:
+        db.close()
+    cutoff = main.datetime.utcnow() - main.timedelta(days=days)
+    waiting = sorted((row.last_remark_at, row.id) for row in students if row.last_remark_at is not None and row.last_remark_at < cutoff)
+    return sorted(row.id for row in students if row.last_remark_at is None) + [student_id for _, student_id in waiting]
+
+def test_followups_pages_are_index_ranges(seeded_client):
+    client = seed(seeded_client)
+    expected = expected_followups(30)
+
+    seen, after = [], None
+    while True:
+        params = {"days": 30, "limit": 3 if not seen else 97}
+        if after is not None:
+            params["after"] = after
+        page, plans = captured_plans(client, "/followups", params=params)
+        assert plans
+        for details in plans:
+            assert any(detail.startswith("SEARCH student USING INDEX ix_student_last_remark_at_id") for detail in details), details
+            assert not any(detail.startswith(("SCAN", "USE TEMP B-TREE")) for detail in details), details
+        seen += [followup["student_id"] for followup in page["followups"]]
+        after = page["next_cursor"]
+        if after is None:
+            break
+
+    assert seen[:len(NEVER_REMARKED)] == NEVER_REMARKED
+    assert seen == expected
+
+def test_student_remarks_pages_are_index_ranges(seeded_client):
+    client = seed(seeded_client)
+    db = main.SessionLocal()
+    try:
+        expected = [row.id for row in db.query(main.StudentRemarks.id).filter(main.StudentRemarks.student_id == 500).order_by(main.StudentRemarks.id.desc())]
+    finally:
+        db.close()
+
+    seen, before = [], None
+    while True:
+        params = {"limit": 2} if before is None else {"limit": 2, "before": before}
+        page, plans = captured_plans(client, "/get_student_remarks/500", params=params)
+        remark_plans = [details for details in plans if any("student_remarks" in detail for detail in details)]
+        assert remark_plans
+        for details in remark_plans:
+            assert any(detail.startswith("SEARCH student_remarks USING INDEX ix_student_remarks_student_id") for detail in details), details
+            assert not any(detail.startswith("USE TEMP B-TREE") for detail in details), details
+        seen += [remark["remark_id"] for remark in page["remarks"]]
+        before = page["next_cursor"]
+        if before is None:
+            break
+
+    assert seen == expected
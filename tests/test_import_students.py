@@ -0,0 +1,55 @@
+import json
+
+import main
+
+CSV_UPLOAD = (
+    # Spreadsheet exports start with a byte order mark
+    "\ufeffname,email,contact_1,contact_2,area,college_name,mode,date_of_join,reference,counselor_id,course_ids,fees_list,pdf_list,remark\n"
+    "Asha,asha@example.com,9800000001,,Bopal,College 1,online,2024-01-10,Walk-in,1,1;2,5000;6000,,Joined\n"
+    'Ravi,ravi@example.com,9800000002,,Satellite,College 2,offline,2024-01-11,Walk-in,1,3,5000,,"Called twice,\nwants a demo"\n'
+    "Dup,asha@example.com,9800000003,,Bopal,College 1,online,2024-01-12,Walk-in,1,1,5000,,Joined\n"
+    "Bad,not-an-email,9800000004,,Bopal,College 1,online,2024-01-12,Walk-in,1,1,5000,,Joined\n"
+).encode("utf-8")
+
+def ndjson_upload():
+    student = {
+        "name": "Meera", "email": "meera@example.com", "contact_1": "9800000005", "contact_2": "", "area": "Maninagar",
+        "college_name": "College 3", "mode": "online", "date_of_join": "2024-02-01", "reference": "Walk-in",
+        "counselor_id": 1, "course_ids": [2], "fees_list": [5500], "pdf_list": [], "remark": "Joined",
+    }
+    lines = [json.dumps(student), "", "{not json", json.dumps(dict(student, email="kiran@example.com", name="Kiran"))]
+    return "\n".join(lines).encode("utf-8")
+
+def stored_student(email: str):
+    db = main.SessionLocal()
+    try:
+        student = db.query(main.Student).filter(main.Student.email == email).one()
+        return student.name, sorted(course.course_id for course in student.courses), [remark.remark for remark in student.remarks]
+    finally:
+        db.close()
+
+def test_import_csv(seeded_client):
+    client = seeded_client(students=10)
+    response = client.post("/import_students", files={"file": ("students.csv", CSV_UPLOAD, "text/csv")})
+    assert response.status_code == 200, response.text
+
+    detail = response.json()["detail"]
+    assert detail["imported"] == 2
+    assert [(error["row"], error["errors"]) for error in detail["errors"]] == [
+        (3, ["Duplicate email in file"]),
+        (4, ["Invalid email format"]),
+    ]
+    assert stored_student("asha@example.com") == ("Asha", [1, 2], ["Joined"])
+    assert stored_student("ravi@example.com") == ("Ravi", [3], ["Called twice,\nwants a demo"])
+
+def test_import_ndjson(seeded_client):
+    client = seeded_client(students=10)
+    response = client.post("/import_students", files={"file": ("students.ndjson", ndjson_upload(), "application/x-ndjson")})
+    assert response.status_code == 200, response.text
+
+    detail = response.json()["detail"]
+    assert detail["imported"] == 2
+    assert [error["row"] for error in detail["errors"]] == [2]
+    assert detail["errors"][0]["errors"][0].startswith("Invalid JSON")
+    assert stored_student("meera@example.com") == ("Meera", [2], ["Joined"])
+    assert stored_student("kiran@example.com") == ("Kiran", [2], ["Joined"])
@@ -0,0 +1,184 @@
+import socketserver
+import threading
+from datetime import datetime, timedelta
+from email import message_from_bytes, policy
+
+import pytest
+
+import main
+
+# A local SMTP stand-in: accepts every message except those addressed to
+# REFUSED, and records each connection with the messages sent over it
+REFUSED = "bounce@example.com"
+
+class SMTPStandIn(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), SMTPHandler)
+        self.sessions = []
+
+    @property
+    def messages(self):
+        return [message for session in self.sessions for message in session]
+
+class SMTPHandler(socketserver.StreamRequestHandler):
+    def reply(self, line: str):
+        self.wfile.write(line.encode() + b"\r\n")
+
+    def handle(self):
+        session = []
+        self.server.sessions.append(session)
+        self.reply("220 localhost")
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            command = line.decode().strip().upper()
+            if command.startswith(("EHLO", "HELO")):
+                self.reply("250 localhost")
+            elif command.startswith("RCPT") and REFUSED.upper() in command:
+                self.reply("550 No such user")
+            elif command.startswith(("MAIL", "RCPT", "RSET", "NOOP")):
+                self.reply("250 OK")
+            elif command == "DATA":
+                self.reply("354 End data with <CR><LF>.<CR><LF>")
+                data = []
+                for line in iter(self.rfile.readline, b".\r\n"):
+                    data.append(line[1:] if line.startswith(b"..") else line)
+                session.append(message_from_bytes(b"".join(data), policy=policy.default))
+                self.reply("250 OK")
+            elif command == "QUIT":
+                self.reply("221 Bye")
+                return
+            else:
+                self.reply("502 Command not implemented")
+
+@pytest.fixture
+def smtp_server(monkeypatch):
+    server = SMTPStandIn()
+    thread = threading.Thread(target=server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True)
+    thread.start()
+    monkeypatch.setattr(main.Envs, "MAIL_SERVER", "127.0.0.1")
+    monkeypatch.setattr(main.Envs, "MAIL_PORT", server.server_address[1])
+    monkeypatch.setattr(main.Envs, "MAIL_FROM", "office@example.com")
+    monkeypatch.setattr(main.Envs, "MAIL_STARTTLS", False)
+    monkeypatch.setattr(main.Envs, "MAIL_USE_CREDENTIALS", False)
+    yield server
+    server.shutdown()
+    server.server_close()
+
+def queue(*recipients):
+    db = main.SessionLocal()
+    try:
+        for recipient in recipients:
+            main.queue_course_pdf_mail(db, "Student", recipient, ["https://example.com/course.pdf"])
+        db.commit()
+    finally:
+        db.close()
+
+def queued():
+    db = main.SessionLocal()
+    try:
+        return {item.recipient: item for item in db.query(main.MailQueue)}
+    finally:
+        db.close()
+
+def make_due():
+    db = main.SessionLocal()
+    try:
+        db.query(main.MailQueue).update({"next_attempt_at": datetime.utcnow() - timedelta(seconds=1)})
+        db.commit()
+    finally:
+        db.close()
+
+def dispatch(dispatcher: main.MailDispatcher) -> int:
+    try:
+        return dispatcher.dispatch_pending()
+    finally:
+        dispatcher.disconnect()
+
+def test_a_batch_goes_out_over_one_connection(seeded_client, smtp_server):
+    seeded_client(students=10)
+    recipients = [f"student{i}@example.com" for i in range(1, 5)]
+    queue(*recipients)
+
+    assert dispatch(main.MailDispatcher()) == 4
+    assert len(smtp_server.sessions) == 1
+    assert [message["To"] for message in smtp_server.messages] == recipients
+    assert {item.status for item in queued().values()} == {main.MAIL_SENT}
+
+def test_course_pdfs_go_out_in_one_message(seeded_client, smtp_server):
+    client = seeded_client(students=10)
+    links = [f"https://example.com/course{i}.pdf" for i in range(1, 4)]
+    response = client.post("/add_student", json={
+        "name": "Mail check", "email": "mail.check@example.com", "contact_1": "9800000000", "contact_2": "",
+        "area": "Bopal", "college_name": "College 1", "mode": "online", "date_of_join": "2024-01-10",
+        "reference": "Walk-in", "counselor_id": 1, "course_ids": [1, 2, 3], "fees_list": [5000, 5000, 5000],
+        "pdf_list": links, "remark": "Joined",
+    })
+    assert response.status_code == 200, response.text
+
+    assert dispatch(main.MailDispatcher()) == 1
+    [message] = smtp_server.messages
+    assert message["To"] == "mail.check@example.com"
+    text = message.get_body(("plain",)).get_content()
+    assert all(link in text for link in links)
+
+def test_a_refused_message_backs_off_and_the_rest_are_sent(seeded_client, smtp_server):
+    seeded_client(students=10)
+    queue("student1@example.com", REFUSED, "student2@example.com")
+
+    before = datetime.utcnow()
+    assert dispatch(main.MailDispatcher()) == 3
+    refused = queued()[REFUSED]
+    assert (refused.status, refused.attempts) == (main.MAIL_PENDING, 1)
+    assert "No such user" in refused.last_error
+    delay = timedelta(seconds=main.MAIL_RETRY_BASE_SECONDS)
+    assert before + delay <= refused.next_attempt_at <= datetime.utcnow() + delay
+    assert [message["To"] for message in smtp_server.messages] == ["student1@example.com", "student2@example.com"]
+
+    # Not due yet
+    assert dispatch(main.MailDispatcher()) == 0
+
+    make_due()
+    before = datetime.utcnow()
+    assert dispatch(main.MailDispatcher()) == 1
+    refused = queued()[REFUSED]
+    assert refused.attempts == 2
+    assert refused.next_attempt_at >= before + 2 * delay
+
+def test_a_message_fails_after_the_last_attempt(seeded_client, smtp_server):
+    seeded_client(students=10)
+    queue(REFUSED)
+
+    for attempt in range(1, main.MAIL_MAX_ATTEMPTS + 1):
+        make_due()
+        assert dispatch(main.MailDispatcher()) == 1
+        status = queued()[REFUSED].status
+        assert status == (main.MAIL_FAILED if attempt == main.MAIL_MAX_ATTEMPTS else main.MAIL_PENDING)
+
+    make_due()
+    assert dispatch(main.MailDispatcher()) == 0
+    assert queued()[REFUSED].attempts == main.MAIL_MAX_ATTEMPTS
+    assert smtp_server.messages == []
+
+def test_claimed_messages_are_leased_to_one_worker(seeded_client):
+    seeded_client(students=10)
+    queue("student1@example.com", "student2@example.com")
+
+    first, second = main.SessionLocal(), main.SessionLocal()
+    try:
+        before = datetime.utcnow()
+        claimed = main.MailDispatcher().claim(first)
+        assert [item.recipient for item in claimed] == ["student1@example.com", "student2@example.com"]
+        assert main.MailDispatcher().claim(second) == []
+    finally:
+        first.close()
+        second.close()
+
+    lease = timedelta(seconds=main.MAIL_LEASE_SECONDS)
+    for item in queued().values():
+        assert (item.status, item.attempts) == (main.MAIL_PENDING, 1)
+        assert item.next_attempt_at >= before + lease
@@ -0,0 +1,45 @@
+from sqlalchemy import text
+
+import main
+import manage
+
+STUDENTS = 1000
+
+def prepare(seeded_client, drop_indexes=()):
+    client = seeded_client(students=STUDENTS)
+    db = main.SessionLocal()
+    try:
+        for index in drop_indexes:
+            db.execute(text(f"DROP INDEX {index}"))
+        db.commit()
+        # Built up front, so each route is checked on its own statements
+        main.ensure_search_indexes(db)
+        main.ensure_schedule_index(db)
+    finally:
+        db.close()
+    token = client.post("/login", data={"email": "counselor1@example.com", "password": manage.SEED_PASSWORD}).json()["detail"]["access_token"]
+    return client, token
+
+def test_no_route_falls_back_to_a_full_scan(seeded_client):
+    client, token = prepare(seeded_client)
+    problems = manage.query_plan_problems(client, token, STUDENTS)
+    assert problems == [], "\n".join(problems)
+
+def test_a_missing_index_is_reported(seeded_client):
+    client, token = prepare(seeded_client, drop_indexes=(
+        "ix_student_remarks_student_id", "ix_student_last_remark_at_id", "ix_student_mode_id", "ix_batch_trainer_name_id",
+    ))
+    problems = {problem.split("\n")[0] for problem in manage.query_plan_problems(client, token, STUDENTS)}
+    assert f"GET /get_student_remarks/{STUDENTS // 2}: full scan of student_remarks" in problems
+    assert "GET /followups: full scan of student" in problems
+    assert f"GET /get_student/{STUDENTS // 2}: full scan of student_remarks" in problems
+    assert "GET /get_all_students: full scan of student" in problems
+    # Allowed filter sets do not exempt the route's other requests
+    assert "GET /get_all_batches: full scan of batch" in problems
+
+def test_a_filtered_page_is_not_a_primary_key_page():
+    page = "SELECT batch.id, course.name FROM batch LEFT OUTER JOIN course ON course.id = batch.course_id{} ORDER BY batch.id LIMIT ? OFFSET ?"
+    assert manage.PRIMARY_KEY_PAGE.match(page.format(""))
+    assert manage.PRIMARY_KEY_PAGE.match(page.format(" WHERE batch.id > ?"))
+    assert not manage.PRIMARY_KEY_PAGE.match(page.format(" WHERE batch.trainer_name = ?"))
+    assert not manage.PRIMARY_KEY_PAGE.match(page.format(" WHERE batch.id > ? AND batch.status = ?"))
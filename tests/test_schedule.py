@@ -0,0 +1,109 @@
+import threading
+import time
+from datetime import date
+
+import pytest
+
+import main
+
+@pytest.mark.parametrize("text, daily_hours, expected", [
+    ("10:00", 2, ("10:00", "12:00")),
+    ("10 am", 1.5, ("10:00", "11:30")),
+    ("10:00-12:00", None, ("10:00", "12:00")),
+    ("4:30 PM to 6 PM", None, ("16:30", "18:00")),
+    # Only the end has am/pm
+    ("7-9 pm", None, ("19:00", "21:00")),
+    ("6 to 8 PM", None, ("18:00", "20:00")),
+    ("9:30-11am", None, ("09:30", "11:00")),
+    ("12-2 pm", None, ("12:00", "14:00")),
+    # The end's pm would put the start after the end
+    ("11-1 pm", None, ("11:00", "13:00")),
+    ("10-12 pm", None, ("10:00", "12:00")),
+    # Only the start has am/pm
+    ("4 pm - 6", None, ("16:00", "18:00")),
+    ("11-1", None, ("11:00", "13:00")),
+    ("25:00", 2, None),
+    ("evening", 2, None),
+    ("10:00", None, None),
+])
+def test_parse_time_range(text, daily_hours, expected):
+    parsed = main.parse_time_range(text, daily_hours)
+    assert (tuple(map(main.clock, parsed)) if parsed else None) == expected
+
+@pytest.mark.parametrize("text, expected", [
+    ("Mon,Wed,Fri", [0, 2, 4]),
+    ("Mon-Fri", [0, 1, 2, 3, 4]),
+    ("Saturday and Sunday", [5, 6]),
+    ("weekdays", [0, 1, 2, 3, 4]),
+    ("MWF", None),
+])
+def test_parse_weekdays(text, expected):
+    assert main.parse_weekdays(text) == expected
+
+def test_evening_batch_does_not_clash_with_a_morning_batch():
+    index = main.ScheduleIndex()
+    start, end = date(2024, 1, 1), date(2024, 3, 31)
+    index.add(1, "Morning", "Trainer 1", main.batch_slots("10:00-12:00", "Mon-Fri", None), start, end)
+
+    evening = main.batch_slots("7-9 pm", "Mon,Wed", None)
+    assert index.conflicts("Trainer 1", evening, start, end) == []
+    assert [slot["batch_id"] for slot in index.conflicts("Trainer 1", main.batch_slots("11 to 1 pm", "Wed", None), start, end)] == [1]
+
+def test_a_batch_written_during_a_rebuild_is_kept(seeded_client, monkeypatch):
+    seeded_client(students=10)
+    index = main.ScheduleIndex()
+    start, end = date(2024, 1, 1), date(2024, 3, 31)
+    evening = main.batch_slots("7-9 pm", "Mon,Wed", None)
+    batch_slots = main.batch_slots
+
+    def slots_with_a_concurrent_write(*args):
+        # A batch committed after the rebuild read its row set
+        if 9999 not in index.pending:
+            index.add(9999, "Evening", "Trainer X", evening, start, end)
+        return batch_slots(*args)
+
+    monkeypatch.setattr(main, "batch_slots", slots_with_a_concurrent_write)
+    db = main.SessionLocal()
+    try:
+        index.rebuild(db)
+    finally:
+        db.close()
+
+    assert index.pending is None
+    assert [slot["batch_id"] for slot in index.conflicts("Trainer X", evening, start, end)] == [9999, 9999]
+    # The seeded active batches are in as well
+    assert set(index.batches) - {9999}
+
+def test_a_stale_schedule_is_refreshed_once_in_the_background(seeded_client, monkeypatch):
+    client = seeded_client(students=10)
+    db = main.SessionLocal()
+    try:
+        trainer_name = db.query(main.Batch.trainer_name).filter(main.Batch.status == 1).first().trainer_name
+    finally:
+        db.close()
+    assert client.get("/trainer_schedule", params={"trainer_name": trainer_name}).json()["slots"]
+    main.schedule_index.built_at = time.monotonic() - 3600
+
+    release = threading.Event()
+    rebuilds = []
+    rebuild = main.schedule_index.rebuild
+
+    def slow_rebuild(db):
+        rebuilds.append(threading.current_thread().name)
+        release.wait(5)
+        rebuild(db)
+
+    monkeypatch.setattr(main.schedule_index, "rebuild", slow_rebuild)
+    for _ in range(5):
+        # Served from the old index, without reading the batch table
+        response = client.get("/trainer_schedule", params={"trainer_name": trainer_name})
+        assert response.json()["slots"]
+        assert response.headers["x-sql-count"] == "0"
+
+    release.set()
+    for _ in range(500):
+        if not main.schedule_index.rebuild_lock.locked():
+            break
+        time.sleep(0.01)
+    assert rebuilds == ["schedule-index-refresh"]
+    assert time.monotonic() - main.schedule_index.built_at < 60
@@ -0,0 +1,78 @@
+import random
+import threading
+import time
+
+import main
+
+WORDS = ("stu", "student", "sat", "satellite", "online", "offline", "college", "bopal", "a b")
+
+def random_documents(count: int, seed: int = 0):
+    rng = random.Random(seed)
+    return {
+        doc_id: [" ".join(rng.choice(WORDS) for _ in range(rng.randint(0, 3))) for _ in range(4)]
+        for doc_id in range(1, count + 1)
+    }
+
+def ranked_ids(documents, term: str):
+    ranked = []
+    for doc_id, fields in documents.items():
+        rank = main.TrigramIndex._rank([field.lower() for field in fields if field], term)
+        if rank is not None:
+            ranked.append((rank, doc_id))
+    return [doc_id for _, doc_id in sorted(ranked)]
+
+def test_top_k_matches_a_full_sort():
+    documents = random_documents(2000)
+    index = main.TrigramIndex(None)
+    for doc_id, fields in documents.items():
+        index.add(doc_id, fields)
+
+    for term in ("stu", "student", "sat", "ent s", "lite", "on", "st", "e"):
+        expected = ranked_ids(documents, term)
+        assert index.search(term) == expected
+        for limit in (1, 10, 500, 5000):
+            assert index.search(term, limit) == expected[:limit]
+
+def test_stale_index_is_refreshed_once_in_the_background(monkeypatch):
+    index = main.TrigramIndex(None)
+    index.add(1, ["Student 1"])
+    index.built_at = time.monotonic() - 3600
+
+    release = threading.Event()
+    rebuilds = []
+
+    def slow_rebuild():
+        rebuilds.append(threading.current_thread().name)
+        release.wait(5)
+        index.built_at = time.monotonic()
+        index.rebuild_lock.release()
+
+    monkeypatch.setattr(index, "_rebuild_in_background", slow_rebuild)
+    threads = [threading.Thread(target=index.refresh, args=(None, 300)) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(1)
+
+    # Every caller returned while the rebuild is still running, on the old data
+    assert not any(thread.is_alive() for thread in threads)
+    assert index.search("student", 10) == [1]
+    release.set()
+    for _ in range(100):
+        if not index.rebuild_lock.locked():
+            break
+        time.sleep(0.01)
+    assert rebuilds == ["search-index-refresh"]
+
+def test_documents_added_during_a_rebuild_are_kept():
+    index = main.TrigramIndex(None)
+
+    def loader(db):
+        yield 1, "Student 1"
+        # A write committed after the rebuild read its row set
+        index.add(2, ["Student 2"])
+        yield 3, "Student 3"
+
+    index.loader = loader
+    index.rebuild(None)
+    assert index.search("student") == [1, 2, 3]
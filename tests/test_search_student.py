@@ -0,0 +1,45 @@
+from sqlalchemy import event
+
+import main
+
+# "e 1" matches students of "College 1", "College 10".."College 19" directly
+# and, through their enrollments, students of "Course 1", "Course 10".."Course 19"
+TERM = "e 1"
+
+def search(client, **params):
+    response = client.get("/search_student", params=dict(params, search_term=TERM))
+    if response.status_code == 404:
+        return []
+    assert response.status_code == 200, response.text
+    return [student["student_id"] for student in response.json()]
+
+def test_pages_add_up_to_the_full_result(seeded_client):
+    client = seeded_client(students=300)
+    everything = search(client, limit=1000)
+    direct = main.student_index.search(TERM)
+    assert everything[:len(direct)] == direct
+    assert len(everything) > len(direct)
+    assert len(set(everything)) == len(everything)
+
+    pages = []
+    for offset in range(0, len(everything) + 7, 7):
+        pages += search(client, limit=7, offset=offset)
+    assert pages == everything
+
+def test_page_past_the_direct_matches_binds_few_parameters(seeded_client):
+    client = seeded_client(students=300)
+    search(client, limit=1)  # builds the index
+    direct = main.student_index.search(TERM)
+
+    bound = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        bound.append(len(parameters))
+
+    event.listen(main.engine, "before_cursor_execute", record)
+    try:
+        assert len(search(client, limit=5, offset=len(direct) - 2)) == 5
+    finally:
+        event.remove(main.engine, "before_cursor_execute", record)
+    # The course ids, the page and the keyset bounds, not every direct match
+    assert max(bound) < 30 < len(direct)
@@ -0,0 +1,40 @@
+import main
+
+# The student read endpoints eager-load remarks, enrollments and course names,
+# so their statement count must not grow with the number of students. Pages
+# stay under 500 rows, the IN-list size selectinload splits its loads at
+def sql_count(response) -> int:
+    assert response.status_code == 200, response.text
+    return int(response.headers["x-sql-count"])
+
+def test_get_all_students_query_count_is_constant(seeded_client):
+    counts = []
+    for students in (20, 400):
+        client = seeded_client(students=students)
+        response = client.get("/get_all_students", params={"limit": 500})
+        assert len(response.json()["students"]) == students
+        counts.append(sql_count(response))
+    assert counts[0] == counts[1]
+
+def test_get_student_query_count_is_constant(seeded_client):
+    counts = []
+    for students in (20, 400):
+        client = seeded_client(students=students)
+        response = client.get(f"/get_student/{students}")
+        assert response.json()["remarks"] and response.json()["courses"]
+        counts.append(sql_count(response))
+    assert counts[0] == counts[1]
+
+def test_get_all_students_returns_every_remark_and_course(seeded_client):
+    client = seeded_client(students=50)
+    students = client.get("/get_all_students", params={"limit": 500}).json()["students"]
+
+    db = main.SessionLocal()
+    try:
+        remarks = db.query(main.StudentRemarks).count()
+        enrollments = db.query(main.StudentCourse).count()
+    finally:
+        db.close()
+    assert sum(len(student["remarks"]) for student in students) == remarks
+    assert sum(len(student["courses"]) for student in students) == enrollments
+    assert all(course["course_name"] for student in students for course in student["courses"])
@@ -0,0 +1,77 @@
+import re
+
+from sqlalchemy import event
+
+import main
+
+WRITE = re.compile(r"^\s*(INSERT INTO|UPDATE|DELETE FROM) (\w+)", re.IGNORECASE)
+
+def student_request(student_id: int, **changes) -> dict:
+    db = main.SessionLocal()
+    try:
+        student = db.query(main.Student).filter(main.Student.id == student_id).one()
+        enrollments = sorted(student.courses, key=lambda enrollment: enrollment.id)
+        request = {
+            "name": student.name, "email": student.email, "contact_1": student.contact_1, "contact_2": student.contact_2,
+            "area": student.area, "college_name": student.college_name, "mode": student.mode,
+            "date_of_join": student.date_of_join.isoformat(), "reference": student.reference, "counselor_id": 1,
+            "course_ids": [enrollment.course_id for enrollment in enrollments],
+            "fees_list": [enrollment.fees for enrollment in enrollments],
+            "pdf_list": [], "remark": "Updated",
+        }
+    finally:
+        db.close()
+    request.update(changes)
+    return request
+
+def enrollments(student_id: int):
+    db = main.SessionLocal()
+    try:
+        return [
+            (row.id, row.course_id, row.fees, row.time_stamp)
+            for row in db.query(main.StudentCourse).filter(main.StudentCourse.student_id == student_id).order_by(main.StudentCourse.id)
+        ]
+    finally:
+        db.close()
+
+# Sends the update and returns the (operation, table) of every write it issued
+def update(client, student_id: int, request: dict):
+    writes = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        match = WRITE.match(statement)
+        if match:
+            writes.append((match.group(1).split()[0].upper(), match.group(2)))
+
+    event.listen(main.engine, "before_cursor_execute", capture)
+    try:
+        response = client.put(f"/update_student/{student_id}", json=request)
+    finally:
+        event.remove(main.engine, "before_cursor_execute", capture)
+    assert response.status_code == 200, response.text
+    return writes
+
+def test_unchanged_enrollments_cost_no_writes(seeded_client):
+    client = seeded_client(students=20)
+    before = enrollments(7)
+    assert before
+
+    writes = update(client, 7, student_request(7, contact_1="9899999999"))
+
+    assert enrollments(7) == before
+    assert [write for write in writes if write[1] in ("student_course", "course_rollup")] == []
+
+def test_a_fee_change_is_one_update(seeded_client):
+    client = seeded_client(students=20)
+    before = enrollments(7)
+    request = student_request(7)
+    request["fees_list"][0] += 500
+
+    writes = update(client, 7, request)
+
+    after = enrollments(7)
+    assert [row[:2] + row[3:] for row in after] == [row[:2] + row[3:] for row in before]
+    assert after[0][2] == before[0][2] + 500
+    assert [write for write in writes if write[1] == "student_course"] == [("UPDATE", "student_course")]
+    # The fee difference is one upsert of the course's rollup rows
+    assert [write for write in writes if write[1] == "course_rollup"] == [("INSERT", "course_rollup")]